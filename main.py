@@ -1,12 +1,21 @@
 import os
+import sys
 import time
 import ftplib
 import re
 import requests
 import json
+import logging
+from logging.handlers import RotatingFileHandler
+import hashlib
+import threading
+import queue
+import heapq
+import itertools
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs, unquote
 from datetime import datetime, timedelta
-from io import BytesIO
-from collections import defaultdict
+from collections import defaultdict, deque
 
 # Configuration - Set these as environment variables
 DISCORD_WEBHOOK_URL = os.getenv('DISCORD_WEBHOOK_URL')
@@ -17,48 +26,252 @@ FTP_PASS = os.getenv('FTP_PASS')
 LOG_BASE_PATH = os.getenv('LOG_BASE_PATH', '/Logs')
 CHECK_INTERVAL = int(os.getenv('CHECK_INTERVAL', '30'))
 SKILL_NOTIFICATIONS = os.getenv('SKILL_NOTIFICATIONS', 'milestones')  # 'all', 'milestones', or 'none'
+NOTIFY_MIN_GAP_SECONDS = float(os.getenv('NOTIFY_MIN_GAP_SECONDS', '2'))  # Spacing between webhook posts
+LEVEL_DIGEST_SECONDS = int(os.getenv('LEVEL_DIGEST_SECONDS', '60'))  # 'all' mode: group level-ups per player (0 = off)
 PLAYER_STATS_FILE = 'player_stats.json'
+COLD_STATS_FILE = 'player_stats_cold.jsonl'  # Full records of inactive players, one JSON object per line
 MANUAL_LEADERBOARD = os.getenv("LEADERBOARD", "False").lower() == "true"
+CATCHUP_ARCHIVES = os.getenv("CATCHUP_ARCHIVES", "False").lower() == "true"
+STATS_API_HOST = os.getenv('STATS_API_HOST', '127.0.0.1')
+STATS_API_PORT = int(os.getenv('STATS_API_PORT', '0'))  # 0 = stats API disabled
+PIPELINE_QUEUE_SIZE = int(os.getenv('PIPELINE_QUEUE_SIZE', '100'))  # Max batches waiting per stage
+MERGE_LATENESS_SECONDS = int(os.getenv('MERGE_LATENESS_SECONDS', '0'))  # Hold events this long for late files
+MERGE_MAX_BUFFERED_BATCHES = int(os.getenv('MERGE_MAX_BUFFERED_BATCHES', '20'))  # Per file, waiting to be merged
+SAVE_DEBOUNCE_SECONDS = int(os.getenv('SAVE_DEBOUNCE_SECONDS', '10'))  # Batch changes into one save
+ACTIVITY_LEADERBOARD_MINUTES = int(os.getenv('ACTIVITY_LEADERBOARD_MINUTES', '50'))
+MISSED_JOB_GRACE_MINUTES = int(os.getenv('MISSED_JOB_GRACE_MINUTES', '60'))  # Late scheduled boards still run within this
+PLAYER_INACTIVE_DAYS = int(os.getenv('PLAYER_INACTIVE_DAYS', '30'))  # Archive players idle this long (0 = never)
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()  # DEBUG, INFO, WARNING or ERROR
+LOG_FILE = os.getenv('LOG_FILE', '')  # Optional JSON-lines log file, rotated by size
+LOG_FILE_MAX_MB = int(os.getenv('LOG_FILE_MAX_MB', '5'))
+LOG_FILE_BACKUPS = int(os.getenv('LOG_FILE_BACKUPS', '3'))
+LOG_RATE_LIMIT = int(os.getenv('LOG_RATE_LIMIT', '20'))  # Max repeats of one message per window (0 = unlimited)
+LOG_RATE_WINDOW = int(os.getenv('LOG_RATE_WINDOW', '60'))
 
 # Track last processed position per file
 file_positions = {}
+file_fingerprints = {}  # Identity of each tracked file (hash of its first bytes)
+archive_manifest = {  # Archived logs_* folders/files that never need another round trip
+    'known_folders': set(),
+    'skipped_folders': set(),
+    'sealed_folders': set(),
+    'sealed_files': set()
+}
 last_events = set()  # Prevent duplicate notifications
-player_stats = {}  # Complete player statistics
+player_stats = {}  # Complete player statistics (active players)
+cold_summaries = {}  # Lifetime aggregates of archived players, full records live in COLD_STATS_FILE
 unsaved_changes = False  # Track if we have unsaved data
+state_version = 0  # Bumped on every change to player_stats (invalidates API cache)
+state_lock = threading.RLock()  # Guards player_stats against concurrent readers
+events_since_last_leaderboard = False  # Set by the apply stage, cleared when boards are posted
+pending_level_ups = {}  # username -> level-ups waiting for the player's next digest
+
+# Pipeline: fetch -> parse_queue -> parse -> apply_queue -> apply -> notify_queue -> notify
+parse_queue = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+apply_queue = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+notify_queue = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+stage_metrics = {
+    stage: {'processed': 0, 'max_depth': 0}
+    for stage in ('fetch', 'parse', 'apply', 'notify')
+}
+pending_effects = []  # Side effects produced by handlers, flushed by the apply stage
+fetch_cursors = {}  # In-flight read position per file, ahead of the committed file_positions
+
+# Cross-file merge (parse stage): one pending event per file, ordered by timestamp
+merge_sources = {}  # log_path -> {'batches', 'lines', 'commit', 'last_key', 'in_heap', 'closed'}
+merge_heap = []  # (event time, tie-breaker, log_path, event_data)
+merge_counter = itertools.count()
+merge_state = {'expected': set(), 'cycle_lines': 0, 'max_key': None}
+merge_capacity = threading.Condition()  # Fetch waits here while a file has too many batches in flight
+merge_inflight = {}  # log_path -> batches handed to the parse stage but not yet merged
+
+# Scheduler: deadline-ordered heap of jobs, run on the main thread
+scheduler_lock = threading.Condition()
+scheduled_jobs = []  # (run_at, tie-breaker, job)
+job_table = {}  # name -> live job; heap entries for replaced jobs are skipped
+job_counter = itertools.count()
+fetch_wakeup = threading.Event()  # Set by the poll job to start a fetch cycle
 
 # Skill milestone levels (for notifications)
 SKILL_MILESTONES = [5, 10]
 
+# How many bytes from the start of a log file identify it across rotations
+FINGERPRINT_BYTES = 4096
+
+# Lines handed from the fetch stage to the parse stage in one batch
+LINES_PER_BATCH = 200
+
+# Bytes downloaded from a log file in one ranged read
+FETCH_CHUNK_BYTES = 128 * 1024
+
+# Skills that get their own leaderboard
+TOP_SKILLS = [
+    'Cooking', 'Fitness', 'Strength', 'Blunt', 'Axe', 'Sprinting',
+    'Lightfoot', 'Nimble', 'Sneak', 'Woodwork', 'Aiming', 'Reloading',
+    'Farming', 'Fishing', 'Trapping', 'PlantScavenging', 'Doctor',
+    'Electricity', 'MetalWelding', 'Mechanics', 'Spear', 'Maintenance',
+    'SmallBlade', 'LongBlade', 'SmallBlunt', 'Tailoring'
+]
+LEADERBOARD_TYPES = ['death', 'survival', 'hours'] + [f"skill_{skill}" for skill in TOP_SKILLS]
+
+# How often inactive players are moved to cold storage
+ARCHIVE_CHECK_HOURS = 6
+
+# Scheduled leaderboards (local time): daily boards at midnight and noon, skill boards Sunday midnight
+DAILY_LEADERBOARD_HOURS = (0, 12)
+WEEKLY_LEADERBOARD_WEEKDAY = 6
+
+log = logging.getLogger('zomboid_tracker')
+
+class RateLimitFilter(logging.Filter):
+    """Drop repeats of the same formatted message beyond LOG_RATE_LIMIT per LOG_RATE_WINDOW"""
+    
+    def __init__(self, limit, window):
+        super().__init__()
+        self.limit = limit
+        self.window = window
+        self.counts = {}  # (level, message) -> [window start, count, suppressed]
+        self.lock = threading.Lock()
+    
+    def filter(self, record):
+        # Game events carry `fields` and are never dropped
+        if not self.limit or hasattr(record, 'fields'):
+            return True
+        
+        with self.lock:
+            return self.check(record)
+    
+    def check(self, record):
+        now = time.monotonic()
+        key = (record.levelno, record.getMessage())
+        entry = self.counts.get(key)
+        
+        if entry is None or now - entry[0] >= self.window:
+            suppressed = entry[2] if entry else 0
+            self.counts[key] = [now, 1, 0]
+            if len(self.counts) > 1000:
+                # Forget only windows that are over, so live ones keep their counts
+                self.counts = {
+                    other: entry for other, entry in self.counts.items()
+                    if now - entry[0] < self.window
+                }
+            if suppressed:
+                record.msg = f"{record.msg} (%d similar messages suppressed)"
+                record.args = tuple(record.args or ()) + (suppressed,)
+            return True
+        
+        entry[1] += 1
+        if entry[1] > self.limit:
+            entry[2] += 1
+            return False
+        return True
+
+class JsonLinesFormatter(logging.Formatter):
+    """Format records as one JSON object per line, including any extra `fields`"""
+    
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'thread': record.threadName,
+            'message': record.getMessage()
+        }
+        entry.update(getattr(record, 'fields', {}))
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+def setup_logging():
+    """Send logs to the console and, if LOG_FILE is set, to a rotating JSON-lines file"""
+    log.setLevel(getattr(logging, LOG_LEVEL, logging.INFO))
+    log.propagate = False
+    log.addFilter(RateLimitFilter(LOG_RATE_LIMIT, LOG_RATE_WINDOW))
+    
+    # pythonw has no console
+    if sys.stdout is not None:
+        console = logging.StreamHandler(sys.stdout)
+        console.setFormatter(logging.Formatter('%(message)s'))
+        log.addHandler(console)
+    
+    if LOG_FILE:
+        file_handler = RotatingFileHandler(
+            LOG_FILE, maxBytes=LOG_FILE_MAX_MB * 1024 * 1024,
+            backupCount=LOG_FILE_BACKUPS, encoding='utf-8'
+        )
+        file_handler.setFormatter(JsonLinesFormatter())
+        log.addHandler(file_handler)
+
 def load_player_stats():
     """Load player statistics from file"""
-    global player_stats, file_positions
+    global player_stats, cold_summaries, file_positions, file_fingerprints, archive_manifest, state_version
     try:
         if os.path.exists(PLAYER_STATS_FILE):
             with open(PLAYER_STATS_FILE, 'r') as f:
                 data = json.load(f)
                 player_stats = data.get('player_stats', {})
+                cold_summaries = data.get('cold_summaries', {})
                 file_positions = data.get('file_positions', {})
-            print(f"✓ Loaded stats for {len(player_stats)} players")
+                file_fingerprints = data.get('file_fingerprints', {})
+                manifest = data.get('archive_manifest', {})
+                archive_manifest = {key: set(manifest.get(key, [])) for key in archive_manifest}
+            
+            # Players saved before last_seen existed count as active from now
+            now = datetime.now().isoformat()
+            for player in player_stats.values():
+                player.setdefault('last_seen', now)
+            
+            state_version += 1
+            log.info("✓ Loaded stats for %d active players (%d archived)", len(player_stats), len(cold_summaries))
     except Exception as e:
-        print(f"⚠️ Could not load player stats: {e}")
+        log.warning("⚠️ Could not load player stats: %s", e)
         player_stats = {}
+        cold_summaries = {}
         file_positions = {}
+        file_fingerprints = {}
 
 def save_player_stats():
-    """Save player statistics to file"""
+    """Save player statistics to file, swapping in a complete temp file"""
     global unsaved_changes
+    temp_file = f"{PLAYER_STATS_FILE}.tmp"
     try:
-        with open(PLAYER_STATS_FILE, 'w') as f:
-            json.dump({
+        with state_lock:
+            data = json.dumps({
                 'player_stats': player_stats,
-                'file_positions': file_positions
-            }, f, indent=2)
-        unsaved_changes = False  # Mark as saved
+                'cold_summaries': cold_summaries,
+                'file_positions': file_positions,
+                'file_fingerprints': file_fingerprints,
+                'archive_manifest': {key: sorted(value) for key, value in archive_manifest.items()}
+            }, indent=2)
+            saved_version = state_version
+        
+        with open(temp_file, 'w') as f:
+            f.write(data)
+        os.replace(temp_file, PLAYER_STATS_FILE)
+        
+        with state_lock:
+            # Changes made while writing still need their own save
+            if state_version == saved_version:
+                unsaved_changes = False  # Mark as saved
     except Exception as e:
-        print(f"⚠️ Could not save player stats: {e}")
+        log.warning("⚠️ Could not save player stats: %s", e)
+        try:
+            os.remove(temp_file)
+        except OSError:
+            pass
+        request_save()  # Try again after the debounce delay
 
-def init_player(username, steam_id):
-    """Initialize a new player in the stats system"""
+def mark_state_changed():
+    """Flag player data as unsaved, invalidate cached API responses and schedule a save"""
+    global unsaved_changes, state_version
+    unsaved_changes = True
+    state_version += 1
+    request_save()
+
+def init_player(username, steam_id, timestamp=None):
+    """Initialize a new player in the stats system, paging archived players back in"""
+    if username not in player_stats and username in cold_summaries:
+        page_in_player(username)
+    
     if username not in player_stats:
         player_stats[username] = {
             'steam_id': steam_id,
@@ -77,6 +290,177 @@ def init_player(username, steam_id):
                 'skill_milestones': {}
             }
         }
+    
+    # last_seen follows game time and only moves forward, so replayed logs don't revive old players
+    player = player_stats[username]
+    seen_at = parse_event_time(timestamp) if timestamp else None
+    if seen_at is None:
+        player.setdefault('last_seen', datetime.now().isoformat())
+    elif seen_at.isoformat() > player.get('last_seen', ''):
+        player['last_seen'] = seen_at.isoformat()
+
+def summarize_player(data):
+    """Precompute the lifetime aggregates the all-time leaderboards need for an archived player"""
+    current = data['current_character']
+    current_hours = current.get('hours_survived', 0) if current['alive'] else 0
+    lifetime = data['lifetime_stats']
+    
+    return {
+        'steam_id': data.get('steam_id'),
+        'total_deaths': data['total_deaths'],
+        'total_respawns': data['total_respawns'],
+        'total_hours_survived': lifetime['total_hours_survived'],
+        'longest_survival': max(lifetime['longest_survival'], current_hours),
+        'total_hours': lifetime['total_hours_survived'] + current_hours,
+        'last_seen': data.get('last_seen')
+    }
+
+def read_cold_records():
+    """Yield (byte offset, username, data) for every record in the cold file; later lines win"""
+    if not os.path.exists(COLD_STATS_FILE):
+        return
+    
+    with open(COLD_STATS_FILE, 'rb') as f:
+        offset = 0
+        for line in f:
+            if line.strip():
+                try:
+                    record = json.loads(line)
+                    yield offset, record['username'], record['data']
+                except (ValueError, KeyError, TypeError):
+                    log.warning("⚠️ Skipping damaged line at byte %d of %s", offset, COLD_STATS_FILE)
+            offset += len(line)
+
+def read_cold_record(username):
+    """Read an archived player's full record, or None, seeking to its cold file offset (caller holds state_lock)"""
+    offset = cold_summaries[username].get('cold_offset')
+    if offset is not None:
+        try:
+            with open(COLD_STATS_FILE, 'rb') as f:
+                f.seek(offset)
+                record = json.loads(f.readline())
+            if record['username'] == username:
+                return record['data']
+        except (OSError, ValueError, KeyError):
+            pass
+    
+    # No offset yet, or it is stale (compacted but not saved): scan for the latest line
+    data = None
+    for _, name, record in read_cold_records():
+        if name == username:
+            data = record
+    return data
+
+def page_in_player(username):
+    """Move an archived player back into memory (caller holds state_lock)
+    
+    The cold file is left as is; stale lines are dropped by the next compaction.
+    """
+    data = None
+    
+    try:
+        data = read_cold_record(username)
+    except Exception as e:
+        log.warning("⚠️ Could not read archived record for %s: %s", username, e)
+    
+    summary = cold_summaries.pop(username)
+    
+    if data is None:
+        # Record lost: rebuild from the summary so lifetime totals survive
+        log.warning("⚠️ No archived record for %s, restoring lifetime totals only", username)
+        data = {
+            'steam_id': summary.get('steam_id'),
+            'total_deaths': summary['total_deaths'],
+            'total_respawns': summary['total_respawns'],
+            'current_character': {
+                'alive': False,
+                'spawn_time': None,
+                'hours_survived': 0,
+                'last_location': [0, 0, 0],
+                'skills': {}
+            },
+            'lifetime_stats': {
+                'total_hours_survived': summary['total_hours_survived'],
+                'longest_survival': summary['longest_survival'],
+                'skill_milestones': {}
+            }
+        }
+    
+    player_stats[username] = data
+    mark_state_changed()
+    log.info("📂 Restored archived player: %s", username)
+
+def archive_inactive_players():
+    """Move players inactive for PLAYER_INACTIVE_DAYS to the cold file, keeping their summaries"""
+    if not PLAYER_INACTIVE_DAYS:
+        return
+    
+    cutoff = (datetime.now() - timedelta(days=PLAYER_INACTIVE_DAYS)).isoformat()
+    
+    with state_lock:
+        inactive = [
+            name for name, data in player_stats.items()
+            if data.get('last_seen', cutoff) < cutoff and name not in pending_level_ups
+        ]
+        if not inactive:
+            return
+        
+        # Write the full records first, so a failure leaves the players in memory
+        offsets = {}
+        try:
+            with open(COLD_STATS_FILE, 'a+b') as f:
+                # An interrupted append can leave a half line behind; start on a fresh one
+                if f.seek(0, os.SEEK_END):
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b'\n':
+                        f.write(b'\n')
+                    f.seek(0, os.SEEK_END)
+                for name in inactive:
+                    offsets[name] = f.tell()
+                    f.write(cold_record_line(name, player_stats[name]))
+        except Exception as e:
+            log.warning("⚠️ Could not archive inactive players: %s", e)
+            return
+        
+        for name in inactive:
+            cold_summaries[name] = dict(summarize_player(player_stats.pop(name)), cold_offset=offsets[name])
+        mark_state_changed()
+    
+    log.info("🗄️ Archived %d inactive player(s)", len(inactive))
+    save_player_stats()
+    compact_cold_file()
+
+def cold_record_line(username, data):
+    """Encode one cold file line"""
+    return (json.dumps({'username': username, 'data': data}, separators=(',', ':')) + "\n").encode('utf-8')
+
+def compact_cold_file():
+    """Rewrite the cold file with one line per archived player, dropping paged-in and stale lines"""
+    try:
+        with state_lock:
+            archived = set(cold_summaries)
+        
+        latest = {}
+        for _, name, data in read_cold_records():
+            if name in archived:
+                latest[name] = data
+        
+        offsets = {}
+        temp_file = f"{COLD_STATS_FILE}.tmp"
+        with open(temp_file, 'wb') as f:
+            for name, data in latest.items():
+                offsets[name] = f.tell()
+                f.write(cold_record_line(name, data))
+        
+        # Swap the file and its offsets together, so a page-in never seeks into the wrong one
+        with state_lock:
+            os.replace(temp_file, COLD_STATS_FILE)
+            for name, offset in offsets.items():
+                if name in cold_summaries:
+                    cold_summaries[name]['cold_offset'] = offset
+            mark_state_changed()
+    except Exception as e:
+        log.warning("⚠️ Could not compact %s: %s", COLD_STATS_FILE, e)
 
 def format_time(hours):
     """Convert hours to readable format (X days, Y hours)"""
@@ -117,17 +501,51 @@ def send_discord_notification(embed_data):
     }
     
     try:
-        response = requests.post(DISCORD_WEBHOOK_URL, json=payload)
+        for attempt in range(3):
+            response = requests.post(DISCORD_WEBHOOK_URL, json=payload)
+            if response.status_code != 429:
+                break
+            retry_after = get_retry_after(response)
+            log.warning("⚠️ Discord rate limit hit, retrying in %.1fs", retry_after)
+            time.sleep(retry_after)
+        
         if response.status_code in [200, 204]:
-            print(f'The Notification went with status code: {response.status_code}')
+            log.debug("The Notification went with status code: %s", response.status_code)
             return True
         else:
-            print(f"✗ Failed to send notification: {response.status_code}")
+            log.error("✗ Failed to send notification: %s", response.status_code)
             return False
     except Exception as e:
-        print(f"✗ Error sending notification: {e}")
+        log.error("✗ Error sending notification: %s", e)
         return False
 
+def get_retry_after(response):
+    """Seconds Discord asks us to wait after a 429 response"""
+    try:
+        return float(response.headers.get('Retry-After') or response.json()['retry_after'])
+    except Exception:
+        return max(NOTIFY_MIN_GAP_SECONDS, 1)
+
+def emit_notification(embed_data):
+    """Queue an embed from an event handler; sent once the apply stage releases state_lock"""
+    pending_effects.append(('embed', embed_data))
+    return True
+
+def queue_notification(embed_data):
+    """Hand an embed straight to the notify stage (must not be called while holding state_lock)"""
+    notify_queue.put(('embed', embed_data))
+    return True
+
+def request_save():
+    """Schedule a debounced write of player_stats.json"""
+    if not is_job_scheduled('save'):
+        schedule_job('save', time.time() + SAVE_DEBOUNCE_SECONDS, save_if_dirty)
+
+def save_if_dirty():
+    """Save player statistics if anything changed since the last save"""
+    if unsaved_changes:
+        save_player_stats()
+
 def send_death_notification(username, hours_survived, coordinates):
     """Send enhanced death notification"""
     player = player_stats[username]
@@ -171,7 +589,7 @@ def send_death_notification(username, hours_survived, coordinates):
         "footer": {"text": "Rest in pieces 💀"}
     }
     
-    return send_discord_notification(embed)
+    return emit_notification(embed)
 
 def send_respawn_notification(username, character_num):
     """Send respawn notification"""
@@ -193,7 +611,7 @@ def send_respawn_notification(username, character_num):
         "footer": {"text": "Good luck out there!"}
     }
     
-    return send_discord_notification(embed)
+    return emit_notification(embed)
 
 def send_skill_notification(username, skill, level, hours_survived):
     """Send skill level-up notification"""
@@ -205,142 +623,219 @@ def send_skill_notification(username, skill, level, hours_survived):
         "footer": {"text": "Keep grinding! 💪"}
     }
     
-    return send_discord_notification(embed)
+    return emit_notification(embed)
 
-def send_leaderboard(leaderboard_type="death"):
-    """Send various leaderboards to Discord"""
-    if not player_stats:
-        print('no player stats')
-        return
+def queue_level_up(username, skill, old_level, level, hours_survived, announced):
+    """Add a level-up to the player's digest, starting the digest window if needed"""
+    digest = pending_level_ups.get(username)
+    if digest is None:
+        digest = pending_level_ups[username] = {'skills': {}, 'hours_survived': hours_survived}
+        schedule_job(
+            f"level_digest:{username}", time.time() + LEVEL_DIGEST_SECONDS,
+            lambda: send_level_digest(username)
+        )
+    
+    # Repeated changes to one skill collapse into one entry; `announced` levels already went out alone
+    entry = digest['skills'].setdefault(skill, {'from': old_level, 'to': level, 'announced': None})
+    entry['to'] = level
+    if announced:
+        entry['announced'] = level
+    digest['hours_survived'] = hours_survived
+
+def build_level_digest(username):
+    """Take a player's pending level-ups and build their digest embed (caller holds state_lock)
+    
+    Returns None when there is nothing left to report.
+    """
+    digest = pending_level_ups.pop(username, None)
+    if digest is None:
+        return None
+    
+    # Skip skills whose final level was already sent on its own
+    changes = [
+        (skill, entry) for skill, entry in sorted(digest['skills'].items())
+        if entry['to'] != entry['announced']
+    ]
+    if not changes:
+        return None
+    
+    hours_text = f"⏱️ After {format_time(digest['hours_survived'])} survived"
+    if len(changes) == 1 and changes[0][1]['to'] == changes[0][1]['from'] + 1:
+        skill, entry = changes[0]
+        description = f"**{skill}** reached level **{entry['to']}**\n{hours_text}"
+        title = f"🎉 {username} leveled up!"
+    else:
+        lines = [f"**{skill}**: {entry['from']} → **{entry['to']}**" for skill, entry in changes]
+        description = "\n".join(lines) + f"\n\n{hours_text}"
+        title = f"🎉 {username} leveled up {len(changes)} skill{'s' if len(changes) != 1 else ''}!"
+    
+    return {
+        "title": title,
+        "description": description,
+        "color": 0xFFD700,
+        "timestamp": datetime.utcnow().isoformat(),
+        "footer": {"text": "Keep grinding! 💪"}
+    }
+
+def send_level_digest(username):
+    """Send a player's level-up digest when its window closes"""
+    with state_lock:
+        embed = build_level_digest(username)
+    if embed:
+        queue_notification(embed)
+
+def flush_all_level_digests():
+    """Send every open digest now instead of waiting for its window (used at shutdown)"""
+    with state_lock:
+        embeds = [build_level_digest(username) for username in list(pending_level_ups)]
+    for embed in embeds:
+        if embed:
+            queue_notification(embed)
+
+def flush_level_digest(username):
+    """Send any pending digest now, so it goes out before a death or respawn (caller holds state_lock)"""
+    embed = build_level_digest(username)
+    if embed:
+        emit_notification(embed)
+
+def get_leaderboard_rows(leaderboard_type="death"):
+    """Rank players for a leaderboard type, best first
+    
+    Returns a list of dicts, or None if the leaderboard type is unknown.
+    """
+    rows = []
     
     if leaderboard_type == "death":
         # Death leaderboard with average survival
-        sorted_players = sorted(
-            [(name, data) for name, data in player_stats.items() if data['total_deaths'] > 0],
-            key=lambda x: x[1]['total_deaths'],
-            reverse=True
-        )[:10]
-        
-        if not sorted_players:
-            print('no sorted players')
-            return
-        
-        lines = []
-        medals = ["🥇", "🥈", "🥉"]
-        
-        for i, (name, data) in enumerate(sorted_players):
-            medal = medals[i] if i < 3 else f"**{i+1}.**"
+        for name, data in player_stats.items():
             deaths = data['total_deaths']
-            avg = data['lifetime_stats']['total_hours_survived'] / deaths if deaths > 0 else 0
-            lines.append(f"{medal} {name}: **{deaths}** death{'s' if deaths != 1 else ''} (avg: {format_time(avg)})")
-        
-        embed = {
-            "title": "💀 Death Leaderboard 💀",
-            "description": "\n".join(lines),
-            "color": 0x9900FF,
-            "timestamp": datetime.utcnow().isoformat(),
-            "footer": {"text": f"Total tracked players: {len(player_stats)}"}
-        }
+            if deaths > 0:
+                rows.append({
+                    'username': name,
+                    'total_deaths': deaths,
+                    'average_survival_hours': data['lifetime_stats']['total_hours_survived'] / deaths
+                })
+        for name, summary in cold_summaries.items():
+            deaths = summary['total_deaths']
+            if deaths > 0:
+                rows.append({
+                    'username': name,
+                    'total_deaths': deaths,
+                    'average_survival_hours': summary['total_hours_survived'] / deaths
+                })
+        rows.sort(key=lambda row: row['total_deaths'], reverse=True)
     
     elif leaderboard_type == "survival":
         # FIX 2: Include current survival time for living characters
-        player_survival_data = []
         for name, data in player_stats.items():
             if data['current_character']['alive']:
                 # Use current calculated survival time for living players
-                current_hours = get_current_survival_hours(data)
-                player_survival_data.append((name, current_hours, True))
+                hours = get_current_survival_hours(data)
+                alive = True
             else:
                 # Use longest survival for dead players
-                longest = data['lifetime_stats']['longest_survival']
-                if longest > 0:
-                    player_survival_data.append((name, longest, False))
-        
-        sorted_players = sorted(player_survival_data, key=lambda x: x[1], reverse=True)[:10]
-        
-        if not sorted_players:
-            return
-        
-        lines = []
-        medals = ["🥇", "🥈", "🥉"]
-        
-        for i, (name, hours, is_alive) in enumerate(sorted_players):
-            if hours == 0:
-                continue
-            medal = medals[i] if i < 3 else f"**{i+1}.**"
-            alive_marker = " 🟢" if is_alive else ""
-            lines.append(f"{medal} {name}: {format_time(hours)}{alive_marker}")
-        
-        if not lines:
-            print('no lines')
-            return
-        
-        embed = {
-            "title": "⏱️ Longest Survival Streaks ⏱️",
-            "description": "\n".join(lines) + "\n\n🟢 = Currently Alive",
-            "color": 0x00BFFF,
-            "timestamp": datetime.utcnow().isoformat(),
-            "footer": {"text": "Survival of the fittest!"}
-        }
+                hours = data['lifetime_stats']['longest_survival']
+                alive = False
+            if hours > 0:
+                rows.append({'username': name, 'hours': hours, 'alive': alive})
+        for name, summary in cold_summaries.items():
+            if summary['longest_survival'] > 0:
+                rows.append({'username': name, 'hours': summary['longest_survival'], 'alive': False})
+        rows.sort(key=lambda row: row['hours'], reverse=True)
     
     elif leaderboard_type == "hours":
         # FIX 3: Add current survival to total hours for living players
-        player_hours_data = []
         for name, data in player_stats.items():
             total_hours = data['lifetime_stats']['total_hours_survived']
             
             # Add current survival time if alive
             if data['current_character']['alive']:
-                current_hours = get_current_survival_hours(data)
-                total_hours += current_hours
+                total_hours += get_current_survival_hours(data)
             
             if total_hours > 0:
-                player_hours_data.append((name, total_hours))
-        
-        sorted_players = sorted(player_hours_data, key=lambda x: x[1], reverse=True)[:10]
-        
-        if not sorted_players:
-            return
-        
-        lines = []
-        medals = ["🥇", "🥈", "🥉"]
-        
-        for i, (name, total_hours) in enumerate(sorted_players):
-            medal = medals[i] if i < 3 else f"**{i+1}.**"
-            lines.append(f"{medal} {name}: {format_time(total_hours)}")
-        
-        embed = {
-            "title": "🏆 Most Experienced Survivors 🏆",
-            "description": "\n".join(lines),
-            "color": 0xFFD700,
-            "timestamp": datetime.utcnow().isoformat(),
-            "footer": {"text": "Total playtime across all lives"}
-        }
+                rows.append({'username': name, 'total_hours': total_hours})
+        for name, summary in cold_summaries.items():
+            if summary['total_hours'] > 0:
+                rows.append({'username': name, 'total_hours': summary['total_hours']})
+        rows.sort(key=lambda row: row['total_hours'], reverse=True)
     
     elif leaderboard_type.startswith("skill_"):
         # FIX 4: Only show skills from ALIVE characters
         skill_name = leaderboard_type.replace("skill_", "")
         
-        players_with_skill = []
         for name, data in player_stats.items():
             # Only check alive characters for current skills
             if data['current_character']['alive']:
                 skill_level = data['current_character']['skills'].get(skill_name, 0)
                 if skill_level > 0:
-                    players_with_skill.append((name, skill_level))
-        
-        if not players_with_skill:
-            return
-        
-        sorted_players = sorted(players_with_skill, key=lambda x: x[1], reverse=True)[:10]
-        
-        lines = []
-        medals = ["🥇", "🥈", "🥉"]
-        
-        for i, (name, level) in enumerate(sorted_players):
-            medal = medals[i] if i < 3 else f"**{i+1}.**"
-            lines.append(f"{medal} {name}: Level **{level}**")
+                    rows.append({'username': name, 'skill': skill_name, 'level': skill_level})
+        rows.sort(key=lambda row: row['level'], reverse=True)
+    
+    else:
+        return None
+    
+    return rows
+
+def send_leaderboard(leaderboard_type="death"):
+    """Send various leaderboards to Discord"""
+    if not player_stats and not cold_summaries:
+        log.debug("no player stats")
+        return
+    
+    with state_lock:
+        rows = get_leaderboard_rows(leaderboard_type)
+        total_players = len(player_stats) + len(cold_summaries)
+    
+    if not rows:
+        log.debug("no players for %s leaderboard", leaderboard_type)
+        return
+    
+    lines = []
+    medals = ["🥇", "🥈", "🥉"]
+    
+    for i, row in enumerate(rows[:10]):
+        medal = medals[i] if i < 3 else f"**{i+1}.**"
         
+        if leaderboard_type == "death":
+            deaths = row['total_deaths']
+            lines.append(f"{medal} {row['username']}: **{deaths}** death{'s' if deaths != 1 else ''} (avg: {format_time(row['average_survival_hours'])})")
+        elif leaderboard_type == "survival":
+            alive_marker = " 🟢" if row['alive'] else ""
+            lines.append(f"{medal} {row['username']}: {format_time(row['hours'])}{alive_marker}")
+        elif leaderboard_type == "hours":
+            lines.append(f"{medal} {row['username']}: {format_time(row['total_hours'])}")
+        else:
+            lines.append(f"{medal} {row['username']}: Level **{row['level']}**")
+    
+    if leaderboard_type == "death":
+        embed = {
+            "title": "💀 Death Leaderboard 💀",
+            "description": "\n".join(lines),
+            "color": 0x9900FF,
+            "timestamp": datetime.utcnow().isoformat(),
+            "footer": {"text": f"Total tracked players: {total_players}"}
+        }
+    
+    elif leaderboard_type == "survival":
+        embed = {
+            "title": "⏱️ Longest Survival Streaks ⏱️",
+            "description": "\n".join(lines) + "\n\n🟢 = Currently Alive",
+            "color": 0x00BFFF,
+            "timestamp": datetime.utcnow().isoformat(),
+            "footer": {"text": "Survival of the fittest!"}
+        }
+    
+    elif leaderboard_type == "hours":
+        embed = {
+            "title": "🏆 Most Experienced Survivors 🏆",
+            "description": "\n".join(lines),
+            "color": 0xFFD700,
+            "timestamp": datetime.utcnow().isoformat(),
+            "footer": {"text": "Total playtime across all lives"}
+        }
+    
+    else:
+        skill_name = leaderboard_type.replace("skill_", "")
         skill_emoji = {
             "Aiming": "🎯",
             "Fitness": "💪",
@@ -361,9 +856,8 @@ def send_leaderboard(leaderboard_type="death"):
             "footer": {"text": f"Highest {skill_name} levels (living characters only)"}
         }
     
-    print(embed)
-    print('This is the call before the return in send_leaderboard')
-    return send_discord_notification(embed)
+    log.debug("Leaderboard embed: %s", embed)
+    return queue_notification(embed)
 
 def parse_perklog_line(line):
     """
@@ -410,6 +904,15 @@ def parse_perklog_line(line):
         'hours_survived': hours_survived
     }
 
+def parse_event_time(timestamp):
+    """Parse a PerkLog timestamp (e.g. "19-10-26 14:03:21.123") into a datetime"""
+    for fmt in ('%d-%m-%y %H:%M:%S.%f', '%d-%m-%y %H:%M:%S'):
+        try:
+            return datetime.strptime(timestamp.strip(), fmt)
+        except ValueError:
+            continue
+    return None
+
 def parse_skills_from_details(details):
     """Parse skill levels from skill dump string"""
     skills = {}
@@ -423,13 +926,13 @@ def parse_skills_from_details(details):
 
 def handle_death_event(event_data):
     """Handle a player death event"""
-    global unsaved_changes
     username = event_data['username']
     steam_id = event_data['steam_id']
     hours_survived = event_data['hours_survived']
     coordinates = event_data['coordinates']
     
-    init_player(username, steam_id)
+    init_player(username, steam_id, event_data['timestamp'])
+    flush_level_digest(username)
     
     player = player_stats[username]
     player['total_deaths'] += 1
@@ -445,19 +948,21 @@ def handle_death_event(event_data):
     # FIX 1: Clear skills when character dies
     player['current_character']['skills'] = {}
     
-    unsaved_changes = True
+    mark_state_changed()
     
-    print(f"💀 Death: {username} survived {format_time(hours_survived)} (Death #{player['total_deaths']})")
+    log.info(
+        "💀 Death: %s survived %s (Death #%d)", username, format_time(hours_survived), player['total_deaths'],
+        extra={'fields': {'event': 'death', 'username': username, 'hours_survived': hours_survived}}
+    )
     send_death_notification(username, hours_survived, coordinates)
-    save_player_stats()
 
 def handle_spawn_event(event_data):
     """Handle a new character spawn event"""
-    global unsaved_changes
     username = event_data['username']
     steam_id = event_data['steam_id']
     
-    init_player(username, steam_id)
+    init_player(username, steam_id, event_data['timestamp'])
+    flush_level_digest(username)
     
     player = player_stats[username]
     player['total_respawns'] += 1
@@ -474,21 +979,22 @@ def handle_spawn_event(event_data):
         skills = parse_skills_from_details(event_data['details'])
         player['current_character']['skills'] = skills
     
-    unsaved_changes = True  # Mark data as changed
+    mark_state_changed()
     
     character_num = player['total_respawns']
-    print(f"🔄 Respawn: {username} (Character #{character_num})")
+    log.info(
+        "🔄 Respawn: %s (Character #%d)", username, character_num,
+        extra={'fields': {'event': 'respawn', 'username': username, 'character': character_num}}
+    )
     send_respawn_notification(username, character_num)
-    save_player_stats()
 
 def handle_level_change_event(event_data):
     """Handle a skill level-up event"""
-    global unsaved_changes
     username = event_data['username']
     steam_id = event_data['steam_id']
     hours_survived = event_data['hours_survived']
     
-    init_player(username, steam_id)
+    init_player(username, steam_id, event_data['timestamp'])
     
     # Parse skill and level from details
     # Format: "Skill][Level" e.g., "Aiming][3"
@@ -498,6 +1004,7 @@ def handle_level_change_event(event_data):
         level = int(details_parts[1])
         
         player = player_stats[username]
+        old_level = player['current_character']['skills'].get(skill, 0)
         player['current_character']['skills'][skill] = level
         player['current_character']['hours_survived'] = hours_survived
         
@@ -506,9 +1013,12 @@ def handle_level_change_event(event_data):
         if level > current_milestone:
             player['lifetime_stats']['skill_milestones'][skill] = level
         
-        unsaved_changes = True  # Mark data as changed
+        mark_state_changed()
         
-        print(f"📈 Level Up: {username} - {skill} level {level}")
+        log.info(
+            "📈 Level Up: %s - %s level %d", username, skill, level,
+            extra={'fields': {'event': 'level_up', 'username': username, 'skill': skill, 'level': level}}
+        )
         
         # Send notification based on settings
         should_notify = False
@@ -517,18 +1027,21 @@ def handle_level_change_event(event_data):
         elif SKILL_NOTIFICATIONS == 'milestones' and level in SKILL_MILESTONES:
             should_notify = True
         
-        if should_notify:
+        if should_notify and SKILL_NOTIFICATIONS == 'all' and LEVEL_DIGEST_SECONDS > 0:
+            # Milestones still go out straight away; everything lands in the digest
+            milestone = level in SKILL_MILESTONES
+            if milestone:
+                send_skill_notification(username, skill, level, hours_survived)
+            queue_level_up(username, skill, old_level, level, hours_survived, announced=milestone)
+        elif should_notify:
             send_skill_notification(username, skill, level, hours_survived)
-        
-        save_player_stats()
 
 def handle_login_event(event_data):
     """Handle a player login event"""
-    global unsaved_changes
     username = event_data['username']
     steam_id = event_data['steam_id']
     
-    init_player(username, steam_id)
+    init_player(username, steam_id, event_data['timestamp'])
     
     # Parse skills if present
     if event_data['details']:
@@ -537,9 +1050,12 @@ def handle_login_event(event_data):
         player['current_character']['skills'] = skills
         player['current_character']['alive'] = True
         player['current_character']['hours_survived'] = event_data['hours_survived']
-        unsaved_changes = True  # Mark data as changed
+        mark_state_changed()
     
-    print(f"👋 Login: {username} ({format_time(event_data['hours_survived'])} survived)")
+    log.info(
+        "👋 Login: %s (%s survived)", username, format_time(event_data['hours_survived']),
+        extra={'fields': {'event': 'login', 'username': username, 'hours_survived': event_data['hours_survived']}}
+    )
 
 def get_current_survival_hours(player_data):
     """Calculate current survival hours for a living character"""
@@ -561,10 +1077,39 @@ def get_current_survival_hours(player_data):
     except:
         return player_data['current_character'].get('hours_survived', 0)
 
+def parse_log_folder_date(folder_name):
+    """Get the date from a folder name like logs_dd-mm or logs_dd-mm-yy_HH-MM-SS, or None"""
+    match = re.match(r'logs_(\d{1,2})-(\d{1,2})(?:-(\d{2,4}))?(?:_(\d{1,2})-(\d{1,2})(?:-(\d{1,2}))?)?', folder_name)
+    if not match:
+        return None
+    
+    day, month, year, hour, minute, second = match.groups()
+    now = datetime.now()
+    try:
+        if year:
+            year = int(year) + (2000 if len(year) == 2 else 0)
+        else:
+            year = now.year
+        folder_date = datetime(
+            year, int(month), int(day),
+            int(hour or 0), int(minute or 0), int(second or 0)
+        )
+        # Without a year, take the most recent such date that isn't in the future
+        if not match.group(3) and folder_date > now + timedelta(days=1):
+            folder_date = folder_date.replace(year=year - 1)
+    except ValueError:
+        return None
+    
+    return folder_date
+
+def log_folder_sort_key(folder_name):
+    """Sort archive folders by the date in their name, oldest first"""
+    return (parse_log_folder_date(folder_name) or datetime.min, folder_name)
+
 def get_log_folders_to_check(ftp):
-    """Get list of log folders to check"""
+    """Get list of log folders to check and the current (newest) archive folder"""
     folders = []
-    folders.append("")
+    current_folder = None
     
     try:
         ftp.cwd(LOG_BASE_PATH)
@@ -586,19 +1131,64 @@ def get_log_folders_to_check(ftp):
         log_folders = [item for item in all_items if item.startswith('logs_') and '-' in item]
         
         if log_folders:
-            log_folders.sort(reverse=True)
-            most_recent = log_folders[0]
-            folders.append(most_recent)
-            print(f"ℹ️ Found archived log folder: {most_recent}")
+            # Day-first names don't sort as text across month boundaries
+            log_folders.sort(key=log_folder_sort_key, reverse=True)
+            current_folder = log_folders[0]
+            
+            with state_lock:
+                # Forget folders that no longer exist on the server
+                listed = set(log_folders)
+                for key in ('known_folders', 'skipped_folders', 'sealed_folders'):
+                    archive_manifest[key] &= listed
+                
+                # Folders already there on the first run are skipped unless CATCHUP_ARCHIVES; later ones are always read
+                first_run = not archive_manifest['known_folders']
+                unseen = [folder for folder in log_folders if folder not in archive_manifest['known_folders']]
+                for folder in unseen:
+                    archive_manifest['known_folders'].add(folder)
+                    if first_run and not CATCHUP_ARCHIVES and folder != current_folder:
+                        archive_manifest['skipped_folders'].add(folder)
+                
+                if CATCHUP_ARCHIVES:
+                    archive_manifest['skipped_folders'].clear()
+                
+                if unseen:
+                    log.info("ℹ️ Found %d new archived log folder(s), newest: %s", len(unseen), current_folder)
+                
+                # Oldest first so events are applied in order
+                for folder in reversed(log_folders):
+                    if folder in archive_manifest['sealed_folders'] or folder in archive_manifest['skipped_folders']:
+                        continue
+                    folders.append(folder)
     
     except Exception as e:
-        print(f"⚠️ Could not list archived log folders: {e}")
+        log.warning("⚠️ Could not list archived log folders: %s", e)
         today = datetime.now()
-        folders.append(f"logs_{today.strftime('%d-%m')}")
         yesterday = today - timedelta(days=1)
         folders.append(f"logs_{yesterday.strftime('%d-%m')}")
+        folders.append(f"logs_{today.strftime('%d-%m')}")
+    
+    # The live logs in the base folder are newer than every archive
+    folders.append("")
     
-    return folders
+    return folders, current_folder
+
+def seal_log_file(log_path):
+    """Mark a fully consumed archive file so it is never polled again"""
+    archive_manifest['sealed_files'].add(log_path)
+    file_positions.pop(log_path, None)
+    file_fingerprints.pop(log_path, None)
+    mark_state_changed()
+
+def seal_log_folder(folder_name, folder_path):
+    """Mark an archive folder whose files are all sealed so it is no longer listed"""
+    archive_manifest['sealed_folders'].add(folder_name)
+    prefix = f"{folder_path}/"
+    archive_manifest['sealed_files'] = {
+        path for path in archive_manifest['sealed_files'] if not path.startswith(prefix)
+    }
+    mark_state_changed()
+    log.info("🔒 Sealed archived log folder: %s", folder_name)
 
 def list_perklog_files(ftp, folder_path):
     """List all PerkLog.txt files in a specific log folder"""
@@ -624,220 +1214,811 @@ def list_perklog_files(ftp, folder_path):
         
         return sorted(files)
     except Exception as e:
-        print(f"⚠️ Could not list files in {folder_path}: {e}")
+        log.warning("⚠️ Could not list files in %s: %s", folder_path, e)
         return []
 
-def download_log_tail(ftp, log_path, from_position=0):
-    """Download the log file from FTP starting from last position"""
+def make_fingerprint(head):
+    """Build a fingerprint from the first bytes of a log file"""
+    return {
+        'hash': hashlib.sha1(head).hexdigest(),
+        'length': len(head)
+    }
+
+def fingerprint_matches(head, fingerprint):
+    """Check whether a file's first bytes still match a stored fingerprint"""
+    length = fingerprint.get('length', 0)
+    if len(head) < length:
+        return False
+    return hashlib.sha1(head[:length]).hexdigest() == fingerprint.get('hash')
+
+def read_file_range(ftp, log_path, start, length):
+    """Download `length` bytes of a file from `start` with a ranged RETR"""
+    chunks = []
+    remaining = length
+    
+    ftp.voidcmd('TYPE I')
+    conn = ftp.transfercmd(f'RETR {log_path}', rest=start or None)
+    try:
+        while remaining > 0:
+            data = conn.recv(min(8192, remaining))
+            if not data:
+                break
+            chunks.append(data)
+            remaining -= len(data)
+    finally:
+        conn.close()
+    
+    # Closing the data connection early makes most servers answer 426
+    try:
+        ftp.voidresp()
+    except ftplib.all_errors:
+        pass
+    
+    return b"".join(chunks)
+
+def check_log_file(ftp, log_path, from_position=0, fingerprint=None):
+    """Return (size, resume position, fingerprint) for a log file, or None if it can't be checked"""
     try:
         file_size = ftp.size(log_path)
         
         if file_size is None:
-            print(f"✗ Could not determine size of {log_path}")
-            return None, from_position
+            log.error("✗ Could not determine size of %s", log_path)
+            return None
+        
+        log.debug("File: %s, Size: %s, From: %s", log_path, file_size, from_position)
         
-        print(f"DEBUG - File: {log_path}, Size: {file_size}, From: {from_position}")
+        if file_size == from_position and (fingerprint or from_position == 0):
+            return file_size, from_position, fingerprint
         
+        head = None
         if file_size < from_position:
             from_position = 0
-            print(f"ℹ️ Log file {log_path} rotated, starting from beginning")
+            log.info("ℹ️ Log file %s rotated, starting from beginning", log_path)
+        elif from_position > 0:
+            head = read_file_range(ftp, log_path, 0, min(file_size, FINGERPRINT_BYTES))
+            if fingerprint and not fingerprint_matches(head, fingerprint):
+                from_position = 0
+                log.info("ℹ️ Log file %s rotated, starting from beginning", log_path)
         
-        if file_size == from_position:
-            return "", from_position
+        # Reading from the start: the fingerprint comes from the first chunk
+        if from_position == 0 and file_size > 0:
+            return file_size, 0, None
+        return file_size, from_position, make_fingerprint(head) if head is not None else None
         
-        buffer = BytesIO()
-        ftp.retrbinary(f'RETR {log_path}', buffer.write, rest=from_position)
+    except Exception as e:
+        log.error("✗ Error reading %s: %s", log_path, e)
+        return None
+
+api_cache = {}  # Precomputed API responses: path -> (cache key, etag, body)
+
+def paginate(items, query):
+    """Slice a list using ?page=N&per_page=M query parameters"""
+    try:
+        page = max(1, int(query.get('page', ['1'])[0]))
+        per_page = min(100, max(1, int(query.get('per_page', ['25'])[0])))
+    except ValueError:
+        page, per_page = 1, 25
+    
+    start = (page - 1) * per_page
+    return {
+        'page': page,
+        'per_page': per_page,
+        'total': len(items),
+        'pages': (len(items) + per_page - 1) // per_page,
+        'items': items[start:start + per_page]
+    }
+
+def build_api_response(path, query):
+    """Build the JSON payload for an API path, or None if nothing lives there"""
+    parts = [unquote(part) for part in path.strip('/').split('/') if part]
+    
+    if parts == ['players']:
+        players = [
+            {
+                'username': name,
+                'alive': data['current_character']['alive'],
+                'total_deaths': data['total_deaths'],
+                'total_respawns': data['total_respawns'],
+                'archived': name in cold_summaries
+            }
+            for name, data in sorted(
+                list(player_stats.items()) + [
+                    (name, dict(summary, current_character={'alive': False}))
+                    for name, summary in cold_summaries.items()
+                ]
+            )
+        ]
+        return paginate(players, query)
+    
+    if len(parts) in (2, 3) and parts[0] == 'players':
+        archived = parts[1] in cold_summaries
+        if len(parts) == 2 and archived:
+            summary = {key: value for key, value in cold_summaries[parts[1]].items() if key != 'cold_offset'}
+            return dict(summary, username=parts[1], archived=True)
         
-        content = buffer.getvalue().decode('utf-8', errors='ignore')
-        new_position = file_size
+        player = read_cold_record(parts[1]) if archived else player_stats.get(parts[1])
+        if player is None:
+            return None
+        if len(parts) == 2:
+            return dict(player, username=parts[1], archived=False)
+        if parts[2] == 'character':
+            return dict(
+                player['current_character'],
+                username=parts[1],
+                current_survival_hours=get_current_survival_hours(player),
+                archived=archived
+            )
+        return None
+    
+    if parts == ['leaderboards']:
+        return {'types': LEADERBOARD_TYPES}
+    
+    if len(parts) == 2 and parts[0] == 'leaderboards':
+        rows = get_leaderboard_rows(parts[1])
+        if rows is None:
+            return None
+        for rank, row in enumerate(rows, start=1):
+            row['rank'] = rank
+        return dict(paginate(rows, query), type=parts[1])
+    
+    return None
+
+def get_api_response(path, query):
+    """Return (etag, body) for a request, served from cache while the state is unchanged"""
+    # Survival and hours boards grow with wall-clock time for living players,
+    # so they are also refreshed once a minute
+    cache_key = (state_version, int(time.time() // 60))
+    request_key = (path, tuple(sorted((key, tuple(values)) for key, values in query.items())))
+    
+    cached = api_cache.get(request_key)
+    if cached and cached[0] == cache_key:
+        return cached[1], cached[2]
+    
+    with state_lock:
+        payload = build_api_response(path, query)
+        if payload is None:
+            return None, None
+        body = json.dumps(payload).encode('utf-8')
+    
+    etag = f'"{hashlib.sha1(body).hexdigest()}"'
+    if len(api_cache) > 1000:
+        api_cache.clear()
+    api_cache[request_key] = (cache_key, etag, body)
+    return etag, body
+
+class StatsAPIHandler(BaseHTTPRequestHandler):
+    """Read-only JSON view of the tracker's in-memory stats"""
+    
+    def do_GET(self):
+        url = urlparse(self.path)
+        try:
+            etag, body = get_api_response(url.path, parse_qs(url.query))
+        except Exception as e:
+            log.warning("⚠️ Stats API error for %s: %s", self.path, e)
+            self.send_error(500)
+            return
         
-        print(f"DEBUG - Downloaded {len(content)} bytes")
+        if body is None:
+            self.send_error(404)
+            return
         
-        return content, new_position
+        if etag in [tag.strip() for tag in self.headers.get('If-None-Match', '').split(',')]:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
         
-    except Exception as e:
-        print(f"✗ Error reading {log_path}: {e}")
-        return None, from_position
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        # Keep request logs out of the console
+        pass
 
-def monitor_server():
-    global MANUAL_LEADERBOARD
-    """Main monitoring loop"""
-    global last_events, file_positions
+def start_stats_api():
+    """Serve the stats API on a background thread if STATS_API_PORT is set"""
+    if not STATS_API_PORT:
+        return None
     
-    load_player_stats()
+    try:
+        server = ThreadingHTTPServer((STATS_API_HOST, STATS_API_PORT), StatsAPIHandler)
+    except OSError as e:
+        log.warning("⚠️ Could not start stats API on port %d: %s", STATS_API_PORT, e)
+        return None
+    
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name="stats-api", daemon=True)
+    thread.start()
+    log.info("✓ Stats API listening on http://%s:%d", STATS_API_HOST, STATS_API_PORT)
+    return server
+
+def record_stage(stage, stage_queue=None):
+    """Count one processed item for a stage and track the peak depth of its input queue"""
+    metrics = stage_metrics[stage]
+    metrics['processed'] += 1
+    if stage_queue is not None:
+        metrics['max_depth'] = max(metrics['max_depth'], stage_queue.qsize())
+
+def split_log_content(content, new_position, fingerprint, seal=False, last=True):
+    """Split bytes ending at new_position into line batches; returns (batches, end of the last whole line)"""
+    end = new_position
+    if content and not seal and not content.endswith(b'\n'):
+        partial = len(content) - (content.rfind(b'\n') + 1)
+        content = content[:len(content) - partial]
+        end = new_position - partial
     
-    print("=" * 50)
-    print("Project Zomboid Stats Tracker Started")
-    print("=" * 50)
-    print(f"FTP Server: {FTP_HOST}:{FTP_PORT}")
-    print(f"Log Base Path: {LOG_BASE_PATH}")
-    print(f"Check Interval: {CHECK_INTERVAL}s")
-    print(f"Discord Webhook: {DISCORD_WEBHOOK_URL[:30]}...")
-    print(f"Tracking {len(player_stats)} players")
-    print(f"Skill Notifications: {SKILL_NOTIFICATIONS}")
-    print("=" * 50)
-    print("\nMonitoring for events...\n")
+    offset = end - len(content)
+    lines = content.split(b'\n') if content else []
+    if lines and not lines[-1]:
+        lines.pop()
     
+    batches = deque()
+    for i in range(0, max(len(lines), 1 if last else 0), LINES_PER_BATCH):
+        batch = lines[i:i + LINES_PER_BATCH]
+        offset = min(offset + sum(len(line) + 1 for line in batch), end)
+        is_last = i + LINES_PER_BATCH >= len(lines)
+        batches.append((batch, {
+            'position': end if is_last else offset,
+            'fingerprint': fingerprint,
+            'seal': seal and is_last,
+            'last': last and is_last
+        }))
+    
+    return batches, end
+
+def read_log_chunk(ftp, log_path, reader):
+    """Download the next chunk of a file and split it into batches for the merge"""
+    start = reader['position']
+    length = min(FETCH_CHUNK_BYTES, reader['size'] - start)
+    chunk = b""
+    
+    if length > 0:
+        try:
+            chunk = read_file_range(ftp, log_path, start, length)
+        except ftplib.all_errors as e:
+            log.error("✗ Error reading %s: %s", log_path, e)
+            reader['seal'] = False
+        
+        # A failed or short read ends the file for this cycle; the rest is read next poll
+        if len(chunk) < length:
+            reader['size'] = start + len(chunk)
+        if start == 0 and chunk:
+            reader['fingerprint'] = make_fingerprint(chunk[:FINGERPRINT_BYTES])
+        record_stage('fetch')
+    
+    reader['position'] = start + len(chunk)
+    last = reader['position'] >= reader['size']
+    
+    # A line cut off by the chunk boundary is carried into the next chunk
+    content = reader['carry'] + chunk
+    batches, end = split_log_content(content, reader['position'], reader['fingerprint'], reader['seal'] and last, last)
+    reader['carry'] = content[len(content) - (reader['position'] - end):]
+    reader['batches'].extend(batches)
+    reader['done'] = last
+
+def send_merge_group(ftp, readers):
+    """Stream one folder's files to the parse stage chunk by chunk, within each file's batch cap"""
+    parse_queue.put(('expect', list(readers)))
+    
+    while readers:
+        with merge_capacity:
+            merge_capacity.wait_for(lambda: any(
+                merge_inflight.get(log_path, 0) < MERGE_MAX_BUFFERED_BATCHES for log_path in readers
+            ))
+            ready = [log_path for log_path in readers if merge_inflight.get(log_path, 0) < MERGE_MAX_BUFFERED_BATCHES]
+            for log_path in ready:
+                merge_inflight[log_path] = merge_inflight.get(log_path, 0) + 1
+        
+        for log_path in ready:
+            reader = readers[log_path]
+            while not reader['batches']:
+                read_log_chunk(ftp, log_path, reader)
+            
+            batch, commit = reader['batches'].popleft()
+            parse_queue.put(('lines', log_path, batch, commit))
+            fetch_cursors[log_path] = (commit['position'], commit['fingerprint'])
+            
+            if reader['done'] and not reader['batches']:
+                del readers[log_path]
+
+def fetch_log_updates(ftp):
+    """Fetch stage: stream new bytes from every active PerkLog file, one folder at a time"""
+    log_folders, current_folder = get_log_folders_to_check(ftp)
+    
+    for folder_name in log_folders:
+        folder_path = f"{LOG_BASE_PATH}/{folder_name}" if folder_name else LOG_BASE_PATH
+        
+        # Archive folders other than the newest never change again
+        can_seal = bool(folder_name) and current_folder is not None and folder_name != current_folder
+        
+        try:
+            perklog_files = list_perklog_files(ftp, folder_path)
+            log_paths = []
+            readers = {}
+            
+            for log_filename in perklog_files:
+                log_path = f"{folder_path}/{log_filename}"
+                log_paths.append(log_path)
+                
+                if log_path in archive_manifest['sealed_files']:
+                    fetch_cursors.pop(log_path, None)
+                    continue
+                
+                if log_path not in fetch_cursors:
+                    with state_lock:
+                        fetch_cursors[log_path] = (file_positions.get(log_path, 0), file_fingerprints.get(log_path))
+                last_pos, last_fingerprint = fetch_cursors[log_path]
+                
+                checked = check_log_file(ftp, log_path, last_pos, last_fingerprint)
+                
+                # Every expected file still sends its last batch, so the merge isn't left waiting on it
+                file_size, position, fingerprint = checked or (last_pos, last_pos, last_fingerprint)
+                readers[log_path] = {
+                    'position': position,
+                    'size': file_size,
+                    'fingerprint': fingerprint,
+                    'seal': can_seal and checked is not None,
+                    'carry': b"",
+                    'batches': deque(),
+                    'done': False
+                }
+            
+            send_merge_group(ftp, readers)
+            
+            if can_seal and log_paths:
+                parse_queue.put(('seal_folder', folder_name, folder_path, log_paths))
+        
+        except Exception as e:
+            log.warning("⚠️ Error processing folder %s: %s", folder_path, e)
+            continue
+
+def fetch_worker():
+    """Fetch stage worker: run one fetch cycle each time the poll job fires"""
     consecutive_errors = 0
     max_errors = 5
-    check_count = 0
-    leaderboard_check_interval = 100
-    events_since_last_leaderboard = False
-    last_daily_leaderboard_date = None
-    last_weekly_leaderboard_date = None
     
     while True:
+        fetch_wakeup.wait()
+        fetch_wakeup.clear()
+        
         try:
             ftp = ftplib.FTP()
             ftp.connect(FTP_HOST, FTP_PORT, timeout=30)
             ftp.login(FTP_USER, FTP_PASS)
             
-            log_folders = get_log_folders_to_check(ftp)
-            
-            for folder_name in log_folders:
-                folder_path = f"{LOG_BASE_PATH}/{folder_name}" if folder_name else LOG_BASE_PATH
-                
-                try:
-                    perklog_files = list_perklog_files(ftp, folder_path)
-                    
-                    for log_filename in perklog_files:
-                        log_path = f"{folder_path}/{log_filename}"
-                        
-                        last_pos = file_positions.get(log_path, 0)
-                        new_content, new_pos = download_log_tail(ftp, log_path, last_pos)
-                        
-                        if new_content:
-                            consecutive_errors = 0
-                            file_positions[log_path] = new_pos
-                            
-                            lines = new_content.split('\n')
-                            
-                            for line in lines:
-                                if not line.strip():
-                                    continue
-                                
-                                # Debug: print first few lines to see format
-                                if check_count == 0:
-                                    print(f"DEBUG - Processing line: {line[:100]}")
-                                
-                                event_data = parse_perklog_line(line)
-                                
-                                if event_data:
-                                    print(f"✓ Parsed event: {event_data['event_type']} - {event_data['username']}")
-                                    
-                                    # Create unique event ID
-                                    event_id = f"{event_data['username']}_{event_data['event_type']}_{event_data['timestamp']}"
-                                    
-                                    if event_id not in last_events:
-                                        last_events.add(event_id)
-                                        events_since_last_leaderboard = True
-                                        
-                                        # Handle different event types
-                                        if event_data['event_type'] == 'Died':
-                                            handle_death_event(event_data)
-                                        elif 'Created Player' in event_data['event_type']:
-                                            handle_spawn_event(event_data)
-                                        elif event_data['event_type'] == 'Level Changed':
-                                            handle_level_change_event(event_data)
-                                        elif event_data['event_type'] == 'Login':
-                                            handle_login_event(event_data)
-                                        
-                                        # Keep only last 500 events in memory
-                                        if len(last_events) > 500:
-                                            last_events = set(list(last_events)[-500:])
-                
-                except Exception as e:
-                    print(f"⚠️ Error processing folder {folder_path}: {e}")
-                    continue
+            fetch_log_updates(ftp)
+            parse_queue.put(('cycle_end',))
             
             ftp.quit()
-            
-            # Scheduled leaderboards
-            current_time = datetime.now()
-            current_date = current_time.date()
-            current_hour = current_time.hour
-            current_minute = current_time.minute
-            current_weekday = current_time.weekday()
-            
-            # Daily leaderboards at noon and midnight
-            if current_minute == 0 and last_daily_leaderboard_date != current_date:
-                if current_hour == 12 or current_hour == 0:
-                    if player_stats:
-                        print(f"\n📊 Sending scheduled {'noon' if current_hour == 12 else 'midnight'} leaderboards...")
-                        send_leaderboard("death")
-                        time.sleep(2)
-                        send_leaderboard("survival")
-                        time.sleep(2)
-                        send_leaderboard("hours")
-                        time.sleep(2)
-                        top_skills = ['Cooking', 'Fitness', 'Strength', 'Blunt', 'Axe', 'Sprinting', 'Lightfoot', 'Nimble', 'Sneak', 'Woodwork', 'Aiming', 'Reloading', 'Farming', 'Fishing', 'Trapping', 'PlantScavenging', 'Doctor', 'Electricity', 'MetalWelding', 'Mechanics', 'Spear', 'Maintenance', 'SmallBlade', 'LongBlade', 'SmallBlunt', 'Tailoring']
-                        for skill in top_skills:
-                            send_leaderboard(f"skill_{skill}")
-                        time.sleep(2)
-                        last_daily_leaderboard_date = current_date
-                        events_since_last_leaderboard = False
-            
-            # Activity-based leaderboard
-            check_count += 1
-            if check_count % leaderboard_check_interval == 0:
-                if events_since_last_leaderboard and player_stats:
-                    print(f"\n📊 Sending activity-based leaderboard...")
-                    send_leaderboard("death")
-                    time.sleep(2)
-                    send_leaderboard("survival")
-                    time.sleep(2)
-                    send_leaderboard("hours")
-                    time.sleep(2)
-                    events_since_last_leaderboard = False
-            # Manual Leaderboard invoked
-            if MANUAL_LEADERBOARD:
-                print("Sending Death board")
-                send_leaderboard("death")
-                print("Sent Death board")
-                time.sleep(2)
-                print("Sending Survival board")
-                send_leaderboard("survival")
-                print("Sent Survival board")
-                time.sleep(2)
-                print("Sending Hours board")
-                send_leaderboard("hours")
-                print("Sent Hours board")
-                time.sleep(2)
-
-                top_skills = [
-                    'Cooking', 'Fitness', 'Strength', 'Blunt', 'Axe', 'Sprinting',
-                    'Lightfoot', 'Nimble', 'Sneak', 'Woodwork', 'Aiming', 'Reloading',
-                    'Farming', 'Fishing', 'Trapping', 'PlantScavenging', 'Doctor',
-                    'Electricity', 'MetalWelding', 'Mechanics', 'Spear', 'Maintenance',
-                    'SmallBlade', 'LongBlade', 'SmallBlunt', 'Tailoring'
-                ]
-                for skill in top_skills:
-                    send_leaderboard(f"skill_{skill}")
-                time.sleep(2)
-                MANUAL_LEADERBOARD = False          
-                        
-            # Save stats periodically (only if there are unsaved changes)
-            if check_count % 10 == 0 and unsaved_changes:
-                print("💾 Periodic save (unsaved changes detected)")
-                save_player_stats()
-            
-            time.sleep(CHECK_INTERVAL)
-            
-        except KeyboardInterrupt:
-            print("\n\nStopping stats tracker...")
-            save_player_stats()
-            break
+            consecutive_errors = 0
+        
         except Exception as e:
             consecutive_errors += 1
-            print(f"✗ Unexpected error: {e}")
+            log.error("✗ Unexpected error: %s", e)
             if consecutive_errors >= max_errors:
-                print(f"⚠️ Too many errors, waiting longer before retry...")
+                log.warning("⚠️ Too many errors, waiting longer before retry...")
                 time.sleep(CHECK_INTERVAL * 3)
+                fetch_wakeup.clear()
                 consecutive_errors = 0
+
+def advance_merge_source(log_path, output):
+    """Parse a file's lines up to its next event and push it onto the merge heap"""
+    source = merge_sources[log_path]
+    
+    while True:
+        if source['lines'] is None:
+            if not source['batches']:
+                del merge_sources[log_path]
+                if source['closed']:
+                    merge_state['expected'].discard(log_path)
+                return
+            lines, commit = source['batches'].popleft()
+            source['lines'] = iter(lines)
+            source['commit'] = commit
+            
+            # Let the fetch stage send this file another batch
+            with merge_capacity:
+                merge_inflight[log_path] -= 1
+                if not merge_inflight[log_path]:
+                    del merge_inflight[log_path]
+                merge_capacity.notify_all()
+        
+        for raw_line in source['lines']:
+            line = raw_line.decode('utf-8', errors='ignore')
+            if not line.strip():
+                continue
+            
+            # Debug: log first few lines to see format
+            if stage_metrics['parse']['processed'] == 0 and log.isEnabledFor(logging.DEBUG):
+                log.debug("Processing line: %s", line[:100])
+            
+            event_data = parse_perklog_line(line)
+            
+            if event_data:
+                log.debug("✓ Parsed event: %s - %s", event_data['event_type'], event_data['username'])
+                
+                # Unparseable timestamps keep the file's previous position in the order
+                key = parse_event_time(event_data['timestamp']) or source['last_key']
+                source['last_key'] = key
+                if merge_state['max_key'] is None or key > merge_state['max_key']:
+                    merge_state['max_key'] = key
+                
+                heapq.heappush(merge_heap, (key, next(merge_counter), log_path, event_data))
+                source['in_heap'] = True
+                return
+        
+        # The batch is used up: its position commits after all of its events
+        output.append(('commit', log_path, source['commit']))
+        source['lines'] = None
+
+def add_merge_batch(log_path, lines, commit, output):
+    """Add a batch of raw lines from one file to the merge"""
+    source = merge_sources.get(log_path)
+    if source is None:
+        source = merge_sources[log_path] = {
+            'batches': deque(),
+            'lines': None,
+            'commit': None,
+            'last_key': datetime.min,
+            'in_heap': False,
+            'closed': False
+        }
+    
+    source['batches'].append((lines, commit))
+    source['closed'] = commit['last']
+    merge_state['cycle_lines'] += len(lines)
+    
+    # A file already in the heap picks up the new batch when it advances
+    if not source['in_heap']:
+        advance_merge_source(log_path, output)
+
+def merge_waiting():
+    """Whether an expected file may still send an event older than the heap's head"""
+    for log_path in merge_state['expected']:
+        source = merge_sources.get(log_path)
+        if source is None or not source['in_heap']:
+            return True
+    return False
+
+def merge_events(output, lateness=None):
+    """Move events from the merge heap to output in timestamp order while no expected file is missing"""
+    while merge_heap and not merge_waiting():
+        key, _, log_path, event_data = merge_heap[0]
+        
+        # Hold events inside the lateness window, unless a full buffer would stall the fetch stage
+        if lateness is not None and not merge_buffers_full():
+            try:
+                watermark = merge_state['max_key'] - lateness
+            except OverflowError:
+                watermark = datetime.min
+            if key > watermark:
+                break
+        
+        heapq.heappop(merge_heap)
+        merge_sources[log_path]['in_heap'] = False
+        output.append(('event', event_data))
+        advance_merge_source(log_path, output)
+        
+        # Only cut right after a commit, so a save never sees a batch's events without its position
+        if len(output) >= LINES_PER_BATCH and output[-1][0] == 'commit':
+            flush_merged(output)
+
+def merge_buffers_full():
+    """Whether any file has as many batches waiting as the fetch stage may send"""
+    return any(len(source['batches']) >= MERGE_MAX_BUFFERED_BATCHES for source in merge_sources.values())
+
+def flush_merged(output):
+    """Hand merged events and commits to the apply stage"""
+    if output:
+        apply_queue.put(('batch', output[:]))
+        del output[:]
+
+def parse_worker():
+    """Parse stage worker: parse line batches and merge events across files by timestamp"""
+    output = []
+    deferred = []  # Folder seals wait until the cycle's commits have been merged
+    lateness = timedelta(seconds=MERGE_LATENESS_SECONDS) if MERGE_LATENESS_SECONDS else None
+    
+    while True:
+        item = parse_queue.get()
+        try:
+            if item[0] == 'expect':
+                merge_state['expected'] = set(item[1])
+            
+            elif item[0] == 'lines':
+                _, log_path, lines, commit = item
+                add_merge_batch(log_path, lines, commit, output)
+                merge_events(output, lateness)
+            
+            elif item[0] == 'cycle_end':
+                # Nothing more is coming this cycle, and a quiet cycle means nothing late is either
+                merge_state['expected'].clear()
+                merge_events(output, lateness if merge_state['cycle_lines'] else None)
+                merge_state['cycle_lines'] = 0
+                
+                output.extend(deferred)
+                del deferred[:]
+                flush_merged(output)
+            
             else:
-                time.sleep(CHECK_INTERVAL)
+                deferred.append(item)
+            record_stage('parse', parse_queue)
+        except Exception as e:
+            log.error("✗ Parse stage error: %s", e)
+
+def apply_event(event_data):
+    """Update player state for one parsed event (caller holds state_lock)"""
+    global last_events, events_since_last_leaderboard
+    
+    # Create unique event ID
+    event_id = f"{event_data['username']}_{event_data['event_type']}_{event_data['timestamp']}"
+    
+    if event_id in last_events:
+        return
+    
+    last_events.add(event_id)
+    events_since_last_leaderboard = True
+    
+    # Handle different event types
+    if event_data['event_type'] == 'Died':
+        handle_death_event(event_data)
+    elif 'Created Player' in event_data['event_type']:
+        handle_spawn_event(event_data)
+    elif event_data['event_type'] == 'Level Changed':
+        handle_level_change_event(event_data)
+    elif event_data['event_type'] == 'Login':
+        handle_login_event(event_data)
+    
+    # Keep only last 500 events in memory
+    if len(last_events) > 500:
+        last_events = set(list(last_events)[-500:])
+
+def apply_worker():
+    """Apply stage worker: update player state and commit file positions"""
+    while True:
+        item = apply_queue.get()
+        try:
+            with state_lock:
+                for entry in item[1]:
+                    if entry[0] == 'event':
+                        event_data = entry[1]
+                        try:
+                            apply_event(event_data)
+                        except Exception as e:
+                            log.error("✗ Error applying %s for %s: %s", event_data['event_type'], event_data['username'], e)
+                    
+                    elif entry[0] == 'commit':
+                        _, log_path, commit = entry
+                        file_positions[log_path] = commit['position']
+                        file_fingerprints[log_path] = commit['fingerprint']
+                        if commit['seal']:
+                            seal_log_file(log_path)
+                    
+                    elif entry[0] == 'seal_folder':
+                        _, folder_name, folder_path, log_paths = entry
+                        if all(path in archive_manifest['sealed_files'] for path in log_paths):
+                            seal_log_folder(folder_name, folder_path)
+                
+                effects = pending_effects[:]
+                del pending_effects[:]
+            
+            # Hand side effects on without holding state_lock, so a full notify
+            # queue can never block a save that needs the lock
+            for effect in effects:
+                notify_queue.put(effect)
+            record_stage('apply', apply_queue)
+        except Exception as e:
+            log.error("✗ Apply stage error: %s", e)
+
+def notify_worker():
+    """Notify stage worker: post webhooks, at least NOTIFY_MIN_GAP_SECONDS apart"""
+    last_post = 0
+    while True:
+        item = notify_queue.get()
+        try:
+            if item[0] == 'embed':
+                time.sleep(max(0, last_post + NOTIFY_MIN_GAP_SECONDS - time.monotonic()))
+                send_discord_notification(item[1])
+                last_post = time.monotonic()
+            record_stage('notify', notify_queue)
+        except Exception as e:
+            log.error("✗ Notify stage error: %s", e)
+        finally:
+            notify_queue.task_done()
+
+def start_pipeline():
+    """Start one worker thread per pipeline stage"""
+    for stage, target in (
+        ('fetch', fetch_worker),
+        ('parse', parse_worker),
+        ('apply', apply_worker),
+        ('notify', notify_worker)
+    ):
+        threading.Thread(target=target, name=f"{stage}-stage", daemon=True).start()
+
+def print_pipeline_metrics():
+    """Print queue depths while any stage has a backlog"""
+    depths = {
+        'parse': parse_queue.qsize(),
+        'apply': apply_queue.qsize(),
+        'notify': notify_queue.qsize()
+    }
+    if any(depths.values()):
+        summary = ", ".join(
+            f"{stage}: {depth}/{PIPELINE_QUEUE_SIZE} (peak {stage_metrics[stage]['max_depth']})"
+            for stage, depth in depths.items()
+        )
+        log.info("📦 Pipeline backlog - %s", summary, extra={'fields': {'queue_depths': depths}})
+
+def send_leaderboards(include_skills=False, include_main=True):
+    """Send the death, survival and hours boards and/or every skill board"""
+    if include_main:
+        send_leaderboard("death")
+        send_leaderboard("survival")
+        send_leaderboard("hours")
+    
+    if include_skills:
+        for skill in TOP_SKILLS:
+            send_leaderboard(f"skill_{skill}")
+
+def schedule_job(name, run_at, func, every=None, cron=None):
+    """Schedule func at run_at (epoch seconds), repeating `every` seconds or on `cron` (hours, weekday)"""
+    job = {'name': name, 'func': func, 'every': every, 'cron': cron}
+    with scheduler_lock:
+        job_table[name] = job
+        heapq.heappush(scheduled_jobs, (run_at, next(job_counter), job))
+        scheduler_lock.notify()
+
+def is_job_scheduled(name):
+    """Check whether a job with this name is waiting to run"""
+    with scheduler_lock:
+        return name in job_table
+
+def next_cron_time(after, hours, weekday=None):
+    """Next whole local hour after `after` (epoch seconds) matching hours and weekday"""
+    candidate = datetime.fromtimestamp(after).replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+    while candidate.hour not in hours or (weekday is not None and candidate.weekday() != weekday):
+        candidate += timedelta(hours=1)
+    return candidate.timestamp()
+
+def run_job(job, run_at):
+    """Run a due job, then schedule its next deadline"""
+    now = time.time()
+    late_by = now - run_at
+    
+    if job['cron'] and late_by > MISSED_JOB_GRACE_MINUTES * 60:
+        log.warning("⚠️ Skipping %s, missed by %s", job['name'], format_time(late_by / 3600))
+    else:
+        try:
+            job['func']()
+        except Exception as e:
+            log.error("✗ Scheduled job %s failed: %s", job['name'], e)
+    
+    if is_job_scheduled(job['name']):
+        return
+    
+    if job['every']:
+        # Missed deadlines collapse into the run that just happened; stay on the original grid
+        missed = int(max(0, time.time() - run_at) // job['every'])
+        if missed:
+            log.warning("⚠️ %s caught up after missing %d deadline(s)", job['name'], missed)
+        schedule_job(job['name'], run_at + job['every'] * (missed + 1), job['func'], every=job['every'])
+    elif job['cron']:
+        hours, weekday = job['cron']
+        schedule_job(job['name'], next_cron_time(max(now, run_at), hours, weekday), job['func'], cron=job['cron'])
+
+def run_scheduler():
+    """Run jobs as their deadlines come due, sleeping until the next one"""
+    while True:
+        with scheduler_lock:
+            while True:
+                # Drop heap entries for jobs that were replaced
+                while scheduled_jobs and job_table.get(scheduled_jobs[0][2]['name']) is not scheduled_jobs[0][2]:
+                    heapq.heappop(scheduled_jobs)
+                
+                now = time.time()
+                if scheduled_jobs and scheduled_jobs[0][0] <= now:
+                    break
+                scheduler_lock.wait(scheduled_jobs[0][0] - now if scheduled_jobs else None)
+            
+            run_at, _, job = heapq.heappop(scheduled_jobs)
+            del job_table[job['name']]
+        
+        run_job(job, run_at)
+
+def send_daily_leaderboards():
+    """Daily leaderboards at noon and midnight"""
+    global events_since_last_leaderboard
+    if player_stats or cold_summaries:
+        log.info("📊 Sending scheduled %s leaderboards...", 'noon' if datetime.now().hour >= 12 else 'midnight')
+        send_leaderboards()
+        events_since_last_leaderboard = False
+
+def send_weekly_leaderboards():
+    """Weekly skill leaderboards on Sunday midnight"""
+    if player_stats:
+        log.info("📊 Sending weekly skill leaderboards...")
+        send_leaderboards(include_skills=True, include_main=False)
+
+def send_activity_leaderboard():
+    """Activity-based leaderboard, only if there have been events since the last one"""
+    global events_since_last_leaderboard
+    if events_since_last_leaderboard and (player_stats or cold_summaries):
+        log.info("📊 Sending activity-based leaderboard...")
+        send_leaderboards()
+        events_since_last_leaderboard = False
+
+def send_manual_leaderboards():
+    """Manual Leaderboard invoked"""
+    log.info("Sending leaderboards")
+    send_leaderboards(include_skills=True)
+    log.info("Sent leaderboards")
+
+def monitor_server():
+    """Main monitoring loop"""
+    load_player_stats()
+    start_stats_api()
+    
+    log.info("=" * 50)
+    log.info("Project Zomboid Stats Tracker Started")
+    log.info("=" * 50)
+    log.info("FTP Server: %s:%s", FTP_HOST, FTP_PORT)
+    log.info("Log Base Path: %s", LOG_BASE_PATH)
+    log.info("Check Interval: %ds", CHECK_INTERVAL)
+    log.info("Discord Webhook: %s...", DISCORD_WEBHOOK_URL[:30])
+    log.info("Tracking %d active players (%d archived)", len(player_stats), len(cold_summaries))
+    log.info("Skill Notifications: %s", SKILL_NOTIFICATIONS)
+    log.info("=" * 50)
+    log.info("Monitoring for events...")
+    
+    start_pipeline()
+    
+    now = time.time()
+    schedule_job('poll', now, fetch_wakeup.set, every=CHECK_INTERVAL)
+    schedule_job('pipeline_metrics', now + CHECK_INTERVAL, print_pipeline_metrics, every=CHECK_INTERVAL)
+    schedule_job(
+        'activity_leaderboard', now + ACTIVITY_LEADERBOARD_MINUTES * 60,
+        send_activity_leaderboard, every=ACTIVITY_LEADERBOARD_MINUTES * 60
+    )
+    schedule_job(
+        'daily_leaderboards', next_cron_time(now, DAILY_LEADERBOARD_HOURS),
+        send_daily_leaderboards, cron=(DAILY_LEADERBOARD_HOURS, None)
+    )
+    schedule_job(
+        'weekly_leaderboards', next_cron_time(now, (0,), WEEKLY_LEADERBOARD_WEEKDAY),
+        send_weekly_leaderboards, cron=((0,), WEEKLY_LEADERBOARD_WEEKDAY)
+    )
+    schedule_job(
+        'archive_players', now + CHECK_INTERVAL, archive_inactive_players,
+        every=ARCHIVE_CHECK_HOURS * 3600
+    )
+    if MANUAL_LEADERBOARD:
+        # Give the first poll a head start so the boards include fresh events
+        schedule_job('manual_leaderboards', now + CHECK_INTERVAL, send_manual_leaderboards)
+    
+    try:
+        run_scheduler()
+    except KeyboardInterrupt:
+        log.info("Stopping stats tracker...")
+        save_player_stats()
+        
+        # Open digests and queued webhooks only live in memory
+        flush_all_level_digests()
+        if notify_queue.unfinished_tasks:
+            log.info("📨 Sending %d pending notification(s)... (Ctrl+C again to skip)", notify_queue.unfinished_tasks)
+            try:
+                notify_queue.join()
+            except KeyboardInterrupt:
+                log.warning("⚠️ Skipped %d pending notification(s)", notify_queue.unfinished_tasks)
 
 if __name__ == "__main__":
+    setup_logging()
+    
     required_vars = {
         'DISCORD_WEBHOOK_URL': DISCORD_WEBHOOK_URL,
         'FTP_HOST': FTP_HOST,
@@ -848,10 +2029,10 @@ if __name__ == "__main__":
     missing_vars = [name for name, value in required_vars.items() if not value]
     
     if missing_vars:
-        print("❌ ERROR: Missing required environment variables:")
+        log.error("❌ ERROR: Missing required environment variables:")
         for var in missing_vars:
-            print(f"  - {var}")
-        print("\nPlease set these environment variables before running.")
+            log.error("  - %s", var)
+        log.error("Please set these environment variables before running.")
         exit(1)
         
     monitor_server()